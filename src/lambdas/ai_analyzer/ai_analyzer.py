@@ -1,16 +1,34 @@
+import hashlib
+import heapq
 import json
 import re
-from typing import List, Dict, Any, Tuple
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple
 import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
 from nltk.sentiment import SentimentIntensityAnalyzer
 from nltk.tag import pos_tag
 from nltk.chunk import ne_chunk
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Alphabetic words of at least three letters, used for keyword tokenization
+_KEYWORD_TOKEN_RE = re.compile(r'\b[^\W\d_]{3,}\b')
+
+# NE chunk labels mapped to the entity bucket they are reported under
+_ENTITY_LABELS = {
+    'PERSON': 'PERSON',
+    'ORGANIZATION': 'ORGANIZATION',
+    'GPE': 'LOCATION'
+}
+
+# Tokens that end a sentence
+_SENTENCE_END = frozenset(('.', '!', '?'))
+
 # Download required NLTK data
 try:
     nltk.data.find('tokenizers/punkt')
@@ -42,92 +60,129 @@ try:
 except LookupError:
     nltk.download('vader_lexicon')
 
+# Word lists shared by every analyzer instance, loaded once per process
+_STOP_WORDS = frozenset(stopwords.words('english'))
+_COMMON_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
+    'could', 'can', 'may', 'might', 'must', 'shall'
+})
+
+# Words that may be reported as keywords: lowercase English words of three
+# or more letters that are not stop words, so filtering is one set lookup
+_KEYWORD_VOCABULARY = frozenset(
+    word for word in nltk.corpus.words.words()
+    if (len(word) > 2 and
+        word.isalpha() and
+        word == word.lower() and
+        word not in _STOP_WORDS)
+)
+
+
+def _empty_entities() -> Dict[str, List[str]]:
+    """Return the entity result reported when nothing can be extracted"""
+    return {
+        'PERSON': [],
+        'ORGANIZATION': [],
+        'LOCATION': [],
+        'PROPER_NOUNS': []
+    }
+
+
+def _neutral_sentiment() -> Dict[str, Any]:
+    """Return the sentiment result reported when nothing can be scored"""
+    return {
+        'overall_sentiment': 'NEUTRAL',
+        'confidence': 0.0,
+        'scores': {
+            'positive': 0.0,
+            'negative': 0.0,
+            'neutral': 1.0,
+            'compound': 0.0
+        },
+        'sentences': []
+    }
+
 
 class EntityExtractor:
     """Extract named entities and proper nouns from text"""
     
+    __slots__ = ('stop_words', 'common_words')
+    
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.common_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-            'could', 'can', 'may', 'might', 'must', 'shall'
-        }
+        self.stop_words = _STOP_WORDS
+        self.common_words = _COMMON_WORDS
     
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def extract_entities(self, text: str,
+                         sentences: Optional[List[str]] = None) -> Dict[str, List[str]]:
         """Extract named entities from text"""
         try:
+            return self._extract_entities(text, sentences)
+        except Exception as e:
+            logger.error("Error extracting entities: %s", e)
+            return _empty_entities()
+    
+    def _extract_entities(self, text: str,
+                          sentences: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """Extract named entities from text, raising on failure"""
+        if sentences is None:
             sentences = sent_tokenize(text)
-            entities = {
-                'PERSON': [],
-                'ORGANIZATION': [],
-                'LOCATION': [],
-                'PROPER_NOUNS': []
-            }
+        entities = _empty_entities()
+        # Set mirrors of the entity lists for O(1) duplicate checks
+        seen = {key: set() for key in entities}
+        
+        for sentence in sentences:
+            # Use NLTK NE chunking for entity extraction
+            tokens = word_tokenize(sentence)
+            pos_tags = pos_tag(tokens)
+            ne_tree = ne_chunk(pos_tags)
             
-            for sentence in sentences:
-                # Use NLTK NE chunking for entity extraction
-                tokens = word_tokenize(sentence)
-                pos_tags = pos_tag(tokens)
-                ne_tree = ne_chunk(pos_tags)
-                
-                # Extract named entities
-                for subtree in ne_tree:
-                    if hasattr(subtree, 'label'):
-                        entity_name = ' '.join([word for word, tag in subtree.leaves()])
-                        entity_type = subtree.label()
-                        
-                        if entity_type == 'PERSON' and entity_name not in entities['PERSON']:
-                            entities['PERSON'].append(entity_name)
-                        elif entity_type == 'ORGANIZATION' and entity_name not in entities['ORGANIZATION']:
-                            entities['ORGANIZATION'].append(entity_name)
-                        elif entity_type == 'GPE' and entity_name not in entities['LOCATION']:
-                            entities['LOCATION'].append(entity_name)
-                
-                # Extract proper nouns as fallback
-                proper_nouns = self._extract_proper_nouns(sentence)
-                for noun in proper_nouns:
-                    if noun not in entities['PROPER_NOUNS']:
-                        entities['PROPER_NOUNS'].append(noun)
+            # Extract named entities
+            for subtree in ne_tree:
+                if hasattr(subtree, 'label'):
+                    entity_name = ' '.join([word for word, tag in subtree.leaves()])
+                    entity_key = _ENTITY_LABELS.get(subtree.label())
+                    
+                    if entity_key and entity_name not in seen[entity_key]:
+                        seen[entity_key].add(entity_name)
+                        entities[entity_key].append(entity_name)
             
-            return entities
-        except Exception as e:
-            logger.error(f"Error extracting entities: {str(e)}")
-            return {
-                'PERSON': [],
-                'ORGANIZATION': [],
-                'LOCATION': [],
-                'PROPER_NOUNS': []
-            }
+            # Extract proper nouns as fallback (reuse this sentence's tokens)
+            proper_nouns = self._extract_proper_nouns(sentence, tokens)
+            for noun in proper_nouns:
+                if noun not in seen['PROPER_NOUNS']:
+                    seen['PROPER_NOUNS'].add(noun)
+                    entities['PROPER_NOUNS'].append(noun)
+        
+        return entities
     
-    def _extract_proper_nouns(self, sentence: str) -> List[str]:
+    def _extract_proper_nouns(self, sentence: str,
+                              tokens: Optional[List[str]] = None) -> List[str]:
         """Extract proper nouns from a sentence with better filtering"""
         try:
-            tokens = word_tokenize(sentence)
+            if tokens is None:
+                tokens = word_tokenize(sentence)
             proper_nouns = []
             
             for i, word in enumerate(tokens):
-                # Check for empty strings and single character words (with length check)
-                if not word or len(word) < 2:
+                # Skip empty/single character tokens and uncapitalized words
+                if len(word) < 2 or not word[:1].isupper():
                     continue
                 
-                # Better length check before accessing word[0]
-                if len(word) > 0 and word[0].isupper():
-                    # Filter out common non-entity patterns
-                    if (word not in self.stop_words and 
-                        word not in self.common_words and
-                        not word.startswith('"') and
-                        not word.startswith("'") and
-                        word.isalpha()):
-                        
-                        # Additional context-based filtering
-                        if not self._is_sentence_start(i, tokens):
-                            proper_nouns.append(word)
+                # Filter out common non-entity patterns; isalpha() also rejects
+                # tokens that start with a quote
+                if (word.isalpha() and
+                        word not in self.stop_words and
+                        word not in self.common_words):
+                    
+                    # Additional context-based filtering
+                    if not self._is_sentence_start(i, tokens):
+                        proper_nouns.append(word)
             
             return proper_nouns
         except Exception as e:
-            logger.error(f"Error extracting proper nouns: {str(e)}")
+            logger.error("Error extracting proper nouns: %s", e)
             return []
     
     def _is_sentence_start(self, index: int, tokens: List[str]) -> bool:
@@ -135,7 +190,7 @@ class EntityExtractor:
         if index == 0:
             return True
         # Check if previous token is a sentence-ending punctuation
-        if index > 0 and tokens[index - 1] in ['.', '!', '?']:
+        if index > 0 and tokens[index - 1] in _SENTENCE_END:
             return True
         return False
 
@@ -143,194 +198,289 @@ class EntityExtractor:
 class SentimentAnalyzer:
     """Analyze sentiment of text"""
     
+    __slots__ = ('sia', 'stop_words')
+    
     def __init__(self):
         self.sia = SentimentIntensityAnalyzer()
-        self.stop_words = set(stopwords.words('english'))
+        self.stop_words = _STOP_WORDS
     
-    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
+    def analyze_sentiment(self, text: str,
+                          sentences: Optional[List[str]] = None) -> Dict[str, Any]:
         """Analyze sentiment of the text"""
         try:
-            if not text or len(text.strip()) == 0:
-                return {
-                    'overall_sentiment': 'NEUTRAL',
-                    'confidence': 0.0,
-                    'scores': {
-                        'positive': 0.0,
-                        'negative': 0.0,
-                        'neutral': 1.0,
-                        'compound': 0.0
-                    },
-                    'sentences': []
-                }
-            
-            # Analyze overall sentiment
-            overall_scores = self.sia.polarity_scores(text)
-            
-            # Determine sentiment label
-            compound = overall_scores['compound']
-            if compound >= 0.05:
-                sentiment = 'POSITIVE'
-            elif compound <= -0.05:
-                sentiment = 'NEGATIVE'
-            else:
-                sentiment = 'NEUTRAL'
-            
-            # Analyze sentence-level sentiment
-            sentences = sent_tokenize(text)
-            sentence_sentiments = []
-            
-            for sentence in sentences:
-                if len(sentence.strip()) > 0:
-                    scores = self.sia.polarity_scores(sentence)
-                    sentence_compound = scores['compound']
-                    
-                    if sentence_compound >= 0.05:
-                        sent_label = 'POSITIVE'
-                    elif sentence_compound <= -0.05:
-                        sent_label = 'NEGATIVE'
-                    else:
-                        sent_label = 'NEUTRAL'
-                    
-                    sentence_sentiments.append({
-                        'sentence': sentence,
-                        'sentiment': sent_label,
-                        'confidence': abs(sentence_compound)
-                    })
-            
-            return {
-                'overall_sentiment': sentiment,
-                'confidence': abs(compound),
-                'scores': {
-                    'positive': overall_scores['pos'],
-                    'negative': overall_scores['neg'],
-                    'neutral': overall_scores['neu'],
-                    'compound': compound
-                },
-                'sentences': sentence_sentiments
-            }
+            return self._analyze_sentiment(text, sentences)
         except Exception as e:
-            logger.error(f"Error analyzing sentiment: {str(e)}")
-            return {
-                'overall_sentiment': 'NEUTRAL',
-                'confidence': 0.0,
-                'scores': {
-                    'positive': 0.0,
-                    'negative': 0.0,
-                    'neutral': 1.0,
-                    'compound': 0.0
-                },
-                'sentences': []
-            }
+            logger.error("Error analyzing sentiment: %s", e)
+            return _neutral_sentiment()
+    
+    def _analyze_sentiment(self, text: str,
+                           sentences: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Analyze sentiment of the text, raising on failure"""
+        if not text or text.isspace():
+            return _neutral_sentiment()
+        
+        # Analyze overall sentiment
+        overall_scores = self.sia.polarity_scores(text)
+        
+        # Determine sentiment label
+        compound = overall_scores['compound']
+        if compound >= 0.05:
+            sentiment = 'POSITIVE'
+        elif compound <= -0.05:
+            sentiment = 'NEGATIVE'
+        else:
+            sentiment = 'NEUTRAL'
+        
+        # Analyze sentence-level sentiment
+        if sentences is None:
+            sentences = sent_tokenize(text)
+        sentence_sentiments = []
+        
+        for sentence in sentences:
+            if sentence and not sentence.isspace():
+                scores = self.sia.polarity_scores(sentence)
+                sentence_compound = scores['compound']
+                
+                if sentence_compound >= 0.05:
+                    sent_label = 'POSITIVE'
+                elif sentence_compound <= -0.05:
+                    sent_label = 'NEGATIVE'
+                else:
+                    sent_label = 'NEUTRAL'
+                
+                sentence_sentiments.append({
+                    'sentence': sentence,
+                    'sentiment': sent_label,
+                    'confidence': abs(sentence_compound)
+                })
+        
+        return {
+            'overall_sentiment': sentiment,
+            'confidence': abs(compound),
+            'scores': {
+                'positive': overall_scores['pos'],
+                'negative': overall_scores['neg'],
+                'neutral': overall_scores['neu'],
+                'compound': compound
+            },
+            'sentences': sentence_sentiments
+        }
 
 
 class KeywordExtractor:
     """Extract keywords from text"""
     
+    __slots__ = ('vocabulary',)
+    
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.english_words = set(nltk.corpus.words.words())
+        self.vocabulary = _KEYWORD_VOCABULARY
     
     def extract_keywords(self, text: str, top_n: int = 10) -> List[Dict[str, Any]]:
         """Extract keywords from text with improved filtering and scoring"""
         try:
-            if not text or len(text.strip()) == 0:
-                return []
-            
-            # Tokenize and clean
-            tokens = word_tokenize(text.lower())
-            
-            # Filter tokens
-            filtered_tokens = [
-                token for token in tokens
-                if (len(token) > 2 and  # Minimum length filter
-                    token.isalpha() and  # Only alphabetic
-                    token not in self.stop_words and
-                    token in self.english_words)  # Valid English words
-            ]
-            
-            if not filtered_tokens:
-                return []
-            
-            # Calculate TF (Term Frequency)
-            term_freq = {}
-            for token in filtered_tokens:
-                term_freq[token] = term_freq.get(token, 0) + 1
+            return self._extract_keywords(text, top_n)
+        except Exception as e:
+            logger.error("Error extracting keywords: %s", e)
+            return []
+    
+    def _extract_keywords(self, text: str, top_n: int = 10) -> List[Dict[str, Any]]:
+        """Extract keywords from text, raising on failure"""
+        if not text or text.isspace():
+            return []
+        
+        # Tokenize and clean: the regex only yields alphabetic words of
+        # three or more letters, so length/isalpha checks are not needed
+        tokens = _KEYWORD_TOKEN_RE.findall(text.lower())
+        
+        # Keep valid English, non stop-word tokens
+        vocabulary = self.vocabulary
+        filtered_tokens = [token for token in tokens if token in vocabulary]
+        
+        if not filtered_tokens:
+            return []
+        
+        # Calculate TF (Term Frequency)
+        term_freq = Counter(filtered_tokens)
+        
+        # Calculate relevance score (TF with weighting)
+        scored_terms = []
+        total_tokens = len(filtered_tokens)
+        
+        for term, freq in term_freq.items():
+            # TF score: frequency relative to total
+            tf_score = freq / total_tokens
             
-            # Calculate relevance score (TF with weighting)
-            keywords = []
-            total_tokens = len(filtered_tokens)
+            # Boost score for longer terms (more specific)
+            length_bonus = min(len(term) / 20, 0.3)
             
-            for term, freq in term_freq.items():
-                # TF score: frequency relative to total
-                tf_score = freq / total_tokens
-                
-                # Boost score for longer terms (more specific)
-                length_bonus = min(len(term) / 20, 0.3)
-                
-                # Final relevance score
-                relevance_score = tf_score + length_bonus
-                
-                keywords.append({
-                    'keyword': term,
-                    'frequency': freq,
-                    'relevance': round(relevance_score, 4)
-                })
+            # Final relevance score
+            relevance_score = tf_score + length_bonus
             
-            # Sort by relevance and return top N
-            keywords.sort(key=lambda x: x['relevance'], reverse=True)
-            return keywords[:top_n]
-        except Exception as e:
-            logger.error(f"Error extracting keywords: {str(e)}")
-            return []
+            scored_terms.append((round(relevance_score, 4), term, freq))
+        
+        # Select the top N by relevance without sorting every term
+        top_terms = heapq.nlargest(top_n, scored_terms, key=itemgetter(0))
+        return [
+            {'keyword': term, 'frequency': freq, 'relevance': relevance}
+            for relevance, term, freq in top_terms
+        ]
 
 
 class AIAnalyzer:
     """Main AI Analyzer class combining all analyzers"""
     
+    __slots__ = ('entity_extractor', 'sentiment_analyzer', 'keyword_extractor',
+                 '_cache', '_cache_bytes')
+    
+    # Maximum number of analysis results kept in the LRU cache
+    CACHE_SIZE = 128
+    
+    # Total encoded size of the cached results, kept small next to the
+    # default 128 MB Lambda memory
+    CACHE_MAX_BYTES = 8 * 1024 * 1024
+    
+    # Results that encode to more than this are returned but not cached
+    CACHE_MAX_ENTRY_BYTES = 512 * 1024
+    
     def __init__(self):
         self.entity_extractor = EntityExtractor()
         self.sentiment_analyzer = SentimentAnalyzer()
         self.keyword_extractor = KeywordExtractor()
+        self._cache: 'OrderedDict[bytes, bytes]' = OrderedDict()
+        self._cache_bytes = 0
     
     def analyze(self, text: str) -> Dict[str, Any]:
-        """Perform complete analysis on text"""
+        """
+        Perform complete analysis on text.
+        
+        Results are cached as encoded JSON keyed by a hash of the text, so
+        repeated documents (retries, duplicate notifications) skip the NLP
+        pipeline. Every call returns a new dict.
+        """
+        result, encoded = self._analyze(text)
+        return result if result is not None else orjson.loads(encoded)
+    
+    def analyze_json(self, text: str) -> str:
+        """Perform complete analysis on text and return it as a JSON string"""
+        result, encoded = self._analyze(text)
+        if encoded is None:
+            # The stdlib encoder escapes what orjson rejects, such as lone
+            # surrogates in the input text
+            return json.dumps(result)
+        return encoded.decode()
+    
+    def _analyze(self, text: str) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        """
+        Run the analysis, consulting the cache first.
+        
+        Returns ``(result, encoded)``: ``result`` is None on a cache hit and
+        ``encoded`` is None for empty text and for results orjson cannot
+        encode; neither is cached.
+        """
         try:
-            if not text or len(text.strip()) == 0:
+            if not text or text.isspace():
                 logger.warning("Empty text provided for analysis")
                 return {
-                    'entities': {
-                        'PERSON': [],
-                        'ORGANIZATION': [],
-                        'LOCATION': [],
-                        'PROPER_NOUNS': []
-                    },
-                    'sentiment': {
-                        'overall_sentiment': 'NEUTRAL',
-                        'confidence': 0.0,
-                        'scores': {
-                            'positive': 0.0,
-                            'negative': 0.0,
-                            'neutral': 1.0,
-                            'compound': 0.0
-                        },
-                        'sentences': []
-                    },
+                    'entities': _empty_entities(),
+                    'sentiment': _neutral_sentiment(),
                     'keywords': []
-                }
+                }, None
+            
+            cache_key = self._cache_key(text)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return None, cached
+            
+            # Set when an analyzer fell back to its default; such results
+            # are returned but not cached, so a later call can retry
+            degraded = False
+            
+            # Split sentences once and share them between analyzers. On failure
+            # pass None so each analyzer hits the error itself and falls back
+            # to its empty default, as it does when called on its own
+            try:
+                sentences = sent_tokenize(text)
+            except Exception as e:
+                logger.error("Error splitting sentences: %s", e)
+                sentences = None
             
             # Perform analyses
-            entities = self.entity_extractor.extract_entities(text)
-            sentiment = self.sentiment_analyzer.analyze_sentiment(text)
-            keywords = self.keyword_extractor.extract_keywords(text)
+            try:
+                entities = self.entity_extractor._extract_entities(text, sentences)
+            except Exception as e:
+                logger.error("Error extracting entities: %s", e)
+                entities = _empty_entities()
+                degraded = True
             
-            return {
+            try:
+                sentiment = self.sentiment_analyzer._analyze_sentiment(text, sentences)
+            except Exception as e:
+                logger.error("Error analyzing sentiment: %s", e)
+                sentiment = _neutral_sentiment()
+                degraded = True
+            
+            try:
+                keywords = self.keyword_extractor._extract_keywords(text)
+            except Exception as e:
+                logger.error("Error extracting keywords: %s", e)
+                keywords = []
+                degraded = True
+            
+            result = {
                 'entities': entities,
                 'sentiment': sentiment,
                 'keywords': keywords
             }
+            try:
+                encoded = orjson.dumps(result)
+            except orjson.JSONEncodeError as e:
+                # orjson rejects text with lone surrogates, which the stdlib
+                # encoder accepts; return such results uncached
+                logger.warning("Analysis result not cacheable: %s", e)
+                return result, None
+            
+            if not degraded:
+                self._cache_put(cache_key, encoded)
+            
+            return result, encoded
         except Exception as e:
-            logger.error(f"Error during analysis: {str(e)}")
+            logger.error("Error during analysis: %s", e)
             raise
+    
+    def _cache_put(self, cache_key: bytes, encoded: bytes) -> None:
+        """Cache an encoded result, evicting the oldest beyond the limits"""
+        size = len(encoded)
+        if size > self.CACHE_MAX_ENTRY_BYTES:
+            return
+        
+        self._cache[cache_key] = encoded
+        self._cache_bytes += size
+        while (len(self._cache) > self.CACHE_SIZE or
+               self._cache_bytes > self.CACHE_MAX_BYTES):
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Hash text into a fixed-size cache key"""
+        return hashlib.blake2b(
+            text.encode('utf-8', 'surrogatepass'), digest_size=16
+        ).digest()
+
+
+# Shared analyzer reused across warm Lambda invocations so its result
+# cache survives; handler.py uses the same instance
+ANALYZER = AIAnalyzer()
+
+
+def dumps_json(obj: Any) -> str:
+    """Encode obj as a JSON string, using json for values orjson rejects"""
+    try:
+        return orjson.dumps(obj).decode()
+    except orjson.JSONEncodeError:
+        # e.g. lone surrogates, which the stdlib encoder escapes
+        return json.dumps(obj)
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -343,20 +493,17 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not text:
             return {
                 'statusCode': 400,
-                'body': json.dumps({'error': 'No text provided'})
+                'body': dumps_json({'error': 'No text provided'})
             }
         
         # Perform analysis
-        analyzer = AIAnalyzer()
-        result = analyzer.analyze(text)
-        
         return {
             'statusCode': 200,
-            'body': json.dumps(result)
+            'body': ANALYZER.analyze_json(text)
         }
     except Exception as e:
-        logger.error(f"Lambda handler error: {str(e)}")
+        logger.error("Lambda handler error: %s", e)
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
+            'body': dumps_json({'error': str(e)})
         }
@@ -1,12 +1,16 @@
-import json
 import boto3
+from botocore.exceptions import ClientError
+import codecs
+import json
 import logging
-import chardet
+from chardet.universaldetector import UniversalDetector
+import orjson
 from typing import Dict, Any, Optional, List
 from pdf2image import convert_from_bytes
 from PIL import Image
 import io
 import os
+import tempfile
 
 # Configure logging
 logger = logging.getLogger()
@@ -23,6 +27,8 @@ class DocumentProcessor:
     Includes improved encoding detection and PDF validation.
     """
     
+    __slots__ = ('s3_client', 'textract_client')
+    
     # Supported document types
     SUPPORTED_FORMATS = {
         'application/pdf': 'pdf',
@@ -32,9 +38,44 @@ class DocumentProcessor:
         'image/tiff': 'tiff'
     }
     
+    # Name of the processing method for each supported format, looked up on
+    # the instance so subclass overrides and patched methods are used
+    FORMAT_PROCESSORS = {
+        'pdf': 'process_pdf',
+        'png': 'process_image',
+        'jpeg': 'process_image',
+        'tiff': 'process_image'
+    }
+    
     # Maximum file size (25 MB for Textract)
     MAX_FILE_SIZE = 25 * 1024 * 1024
     
+    # Number of leading bytes searched for the PDF %PDF signature
+    PDF_HEADER_WINDOW = 1024
+    
+    # Number of trailing bytes searched for the PDF %%EOF marker
+    PDF_TRAILER_WINDOW = 1024
+    
+    # Encodings tried, in order, when listing alternative encodings
+    COMMON_ENCODINGS = (
+        'utf-8', 'utf-16', 'latin-1', 'iso-8859-1',
+        'cp1252', 'ascii', 'utf-16-le', 'utf-16-be'
+    )
+    
+    # Maximum number of alternative encodings reported
+    MAX_ALTERNATIVE_ENCODINGS = 3
+    
+    # Chunk size used when scanning content for encoding checks
+    DECODE_CHUNK_SIZE = 64 * 1024
+    
+    # S3 error codes meaning the requested object does not exist. Without
+    # s3:ListBucket, which the template does not grant, S3 reports a missing
+    # key as AccessDenied instead, and that goes to the generic error path
+    S3_NOT_FOUND_CODES = frozenset({'NoSuchKey', '404', 'NotFound'})
+    
+    # Image formats (as reported by PIL) that Textract accepts unconverted
+    TEXTRACT_NATIVE_FORMATS = frozenset({'PNG', 'JPEG'})
+    
     def __init__(self):
         """Initialize the DocumentProcessor."""
         self.s3_client = s3_client
@@ -51,22 +92,21 @@ class DocumentProcessor:
         Returns:
             Dictionary with validation results
         """
+        file_size = len(file_content)
         validation_result = {
             'valid': True,
             'errors': [],
             'warnings': [],
-            'file_size': len(file_content)
+            'file_size': file_size
         }
         
         # Check file size
-        if len(file_content) > self.MAX_FILE_SIZE:
+        if file_size > self.MAX_FILE_SIZE:
             validation_result['valid'] = False
-            validation_result['errors'].append(
-                f"File size ({len(file_content)} bytes) exceeds maximum allowed ({self.MAX_FILE_SIZE} bytes)"
-            )
+            validation_result['errors'].append(self._file_size_error(file_size))
         
         # Check file size minimum
-        if len(file_content) < 100:
+        if file_size < 100:
             validation_result['valid'] = False
             validation_result['errors'].append("File is too small or empty")
         
@@ -85,6 +125,35 @@ class DocumentProcessor:
         
         return validation_result
     
+    def _file_size_error(self, file_size: int) -> str:
+        """
+        Build the validation error for a document over MAX_FILE_SIZE.
+        
+        Args:
+            file_size: The document size in bytes
+            
+        Returns:
+            Error message
+        """
+        return f"File size ({file_size} bytes) exceeds maximum allowed ({self.MAX_FILE_SIZE} bytes)"
+    
+    def _validation_failure(self, validation: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the processing result for a document that failed validation.
+        
+        Args:
+            validation: Validation results, as returned by validate_document
+            
+        Returns:
+            Processing result
+        """
+        logger.error("Document validation failed: %s", validation['errors'])
+        return {
+            'success': False,
+            'error': f"Document validation failed: {', '.join(validation['errors'])}",
+            'validation': validation
+        }
+    
     def _validate_pdf(self, file_content: bytes) -> bool:
         """
         Validate PDF file structure.
@@ -96,20 +165,25 @@ class DocumentProcessor:
             True if valid PDF, False otherwise
         """
         try:
-            # Check PDF signature
-            if not file_content.startswith(b'%PDF'):
-                logger.warning("PDF file does not start with valid PDF signature")
+            # Check PDF signature; readers accept a short prefix of junk
+            # before it, so only the header window is searched
+            if file_content.find(b'%PDF', 0, self.PDF_HEADER_WINDOW) == -1:
+                logger.warning(
+                    "PDF file has no %%PDF signature in the first %s bytes",
+                    self.PDF_HEADER_WINDOW
+                )
                 return False
             
-            # Check for EOF marker
-            if not b'%%EOF' in file_content:
+            # Check for EOF marker; the spec places it in the file trailer,
+            # so only the tail needs to be searched
+            if file_content.find(b'%%EOF', -self.PDF_TRAILER_WINDOW) == -1:
                 logger.warning("PDF file does not contain EOF marker")
                 # This is a warning, not necessarily invalid - some PDFs might not have strict EOF
                 return True
             
             return True
         except Exception as e:
-            logger.error(f"Error validating PDF: {str(e)}")
+            logger.error("Error validating PDF: %s", e)
             return False
     
     def detect_encoding(self, file_content: bytes) -> Dict[str, Any]:
@@ -130,8 +204,14 @@ class DocumentProcessor:
         }
         
         try:
-            # Try chardet detection first
-            detected = chardet.detect(file_content)
+            # Try chardet detection first, feeding it fixed-size chunks and
+            # stopping as soon as it is confident instead of scanning the whole file
+            detector = UniversalDetector()
+            for start in range(0, len(file_content), self.DECODE_CHUNK_SIZE):
+                detector.feed(file_content[start:start + self.DECODE_CHUNK_SIZE])
+                if detector.done:
+                    break
+            detected = detector.close()
             
             if detected and detected.get('encoding'):
                 encoding_result['encoding'] = detected['encoding']
@@ -140,9 +220,12 @@ class DocumentProcessor:
                 
                 # Validate detected encoding is valid
                 try:
-                    file_content.decode(detected['encoding'])
+                    self._check_decodable(file_content, detected['encoding'])
                 except (UnicodeDecodeError, LookupError) as e:
-                    logger.warning(f"Detected encoding {detected['encoding']} failed validation: {str(e)}")
+                    logger.warning(
+                        "Detected encoding %s failed validation: %s",
+                        detected['encoding'], e
+                    )
                     encoding_result['encoding'] = 'utf-8'
                     encoding_result['confidence'] = 0.0
                     encoding_result['detection_method'] = 'fallback'
@@ -151,7 +234,7 @@ class DocumentProcessor:
                 encoding_result['detection_method'] = 'fallback'
         
         except Exception as e:
-            logger.warning(f"Error during encoding detection: {str(e)}. Using UTF-8.")
+            logger.warning("Error during encoding detection: %s. Using UTF-8.", e)
             encoding_result['detection_method'] = 'error_fallback'
         
         # Attempt to detect alternative encodings
@@ -174,22 +257,61 @@ class DocumentProcessor:
             List of alternative encodings that work
         """
         alternatives = []
-        common_encodings = [
-            'utf-8', 'utf-16', 'latin-1', 'iso-8859-1', 
-            'cp1252', 'ascii', 'utf-16-le', 'utf-16-be'
-        ]
+        primary_encoding = primary_encoding.lower()
         
-        for encoding in common_encodings:
-            if encoding.lower() == primary_encoding.lower():
+        for encoding in self.COMMON_ENCODINGS:
+            if encoding == primary_encoding:
                 continue
             
             try:
-                file_content.decode(encoding)
+                self._check_decodable(file_content, encoding)
                 alternatives.append(encoding)
             except (UnicodeDecodeError, LookupError):
                 pass
+            
+            # Each attempt decodes the whole file; stop once enough are found
+            if len(alternatives) == self.MAX_ALTERNATIVE_ENCODINGS:
+                break
         
-        return alternatives[:3]  # Return top 3 alternatives
+        return alternatives
+    
+    def _check_decodable(self, file_content: bytes, encoding: str) -> None:
+        """
+        Check that content decodes with an encoding without building the
+        decoded string.
+        
+        Args:
+            file_content: The file content as bytes
+            encoding: The encoding to check
+            
+        Raises:
+            UnicodeDecodeError: If the content is not valid in the encoding
+            LookupError: If the encoding is unknown
+        """
+        codec = codecs.lookup(encoding)
+        
+        if codec.name == 'ascii':
+            if not file_content.isascii():
+                # Let the codec raise its usual error for the offending byte
+                file_content.decode(encoding)
+            return
+        
+        if codec.name == 'iso8859-1':
+            # Every byte value maps to a character
+            return
+        
+        if codec.incrementaldecoder is None or codec.name in ('utf-16', 'utf-32'):
+            # The incremental BOM-sniffing decoders are stricter than
+            # bytes.decode about BOM-less input, so decode in one go
+            file_content.decode(encoding)
+            return
+        
+        # Decode in bounded chunks so only one chunk of text exists at a time
+        decoder = codec.incrementaldecoder()
+        view = memoryview(file_content)
+        for start in range(0, len(view), self.DECODE_CHUNK_SIZE):
+            decoder.decode(view[start:start + self.DECODE_CHUNK_SIZE])
+        decoder.decode(b'', final=True)
     
     def process_pdf(self, file_content: bytes) -> Dict[str, Any]:
         """
@@ -202,49 +324,62 @@ class DocumentProcessor:
             Dictionary with extracted text and metadata
         """
         try:
-            logger.info("Processing PDF document")
-            
-            # Convert PDF to images
-            images = convert_from_bytes(file_content, dpi=150)
-            
-            if not images:
-                raise ValueError("PDF conversion resulted in no images")
-            
-            logger.info(f"Converted PDF to {len(images)} image(s)")
-            
-            extracted_text = ""
-            document_metadata = {
-                'total_pages': len(images),
-                'format': 'pdf',
-                'pages': []
-            }
-            
-            # Process each page with Textract
-            for page_num, image in enumerate(images, 1):
-                try:
-                    page_text = self._process_image_with_textract(image, page_num)
-                    extracted_text += f"\n--- Page {page_num} ---\n{page_text}"
-                    
-                    document_metadata['pages'].append({
-                        'page_number': page_num,
-                        'status': 'success'
-                    })
-                except Exception as e:
-                    logger.error(f"Error processing PDF page {page_num}: {str(e)}")
-                    document_metadata['pages'].append({
-                        'page_number': page_num,
-                        'status': 'error',
-                        'error': str(e)
-                    })
+            logger.debug("Processing PDF document")
+            
+            with tempfile.TemporaryDirectory() as output_folder:
+                # Render pages straight to PNG files rather than holding every
+                # decoded page image in memory at once
+                page_paths = convert_from_bytes(
+                    file_content,
+                    dpi=150,
+                    fmt='png',
+                    output_folder=output_folder,
+                    paths_only=True
+                )
+                
+                if not page_paths:
+                    raise ValueError("PDF conversion resulted in no images")
+                
+                logger.debug("Converted PDF to %s image(s)", len(page_paths))
+                
+                page_texts = []
+                document_metadata = {
+                    'total_pages': len(page_paths),
+                    'format': 'pdf',
+                    'pages': []
+                }
+                
+                # Process each page with Textract
+                for page_num, page_path in enumerate(page_paths, 1):
+                    try:
+                        with open(page_path, 'rb') as page_file:
+                            page_bytes = page_file.read()
+                        # Free /tmp space as soon as the page has been read
+                        os.remove(page_path)
+                        
+                        page_text = self._detect_document_text(page_bytes, page_num)
+                        page_texts.append(f"\n--- Page {page_num} ---\n{page_text}")
+                        
+                        document_metadata['pages'].append({
+                            'page_number': page_num,
+                            'status': 'success'
+                        })
+                    except Exception as e:
+                        logger.error("Error processing PDF page %s: %s", page_num, e)
+                        document_metadata['pages'].append({
+                            'page_number': page_num,
+                            'status': 'error',
+                            'error': str(e)
+                        })
             
             return {
                 'success': True,
-                'text': extracted_text,
+                'text': ''.join(page_texts),
                 'metadata': document_metadata
             }
         
         except Exception as e:
-            logger.error(f"Error processing PDF: {str(e)}")
+            logger.error("Error processing PDF: %s", e)
             return {
                 'success': False,
                 'error': f"PDF processing failed: {str(e)}",
@@ -262,21 +397,26 @@ class DocumentProcessor:
             Dictionary with extracted text and metadata
         """
         try:
-            logger.info("Processing image document")
+            logger.debug("Processing image document")
             
-            # Validate image
+            # Validate image; format, size and mode stay readable after verify
             try:
                 image = Image.open(io.BytesIO(file_content))
                 image.verify()
-                # Need to reopen after verify
-                image = Image.open(io.BytesIO(file_content))
             except Exception as e:
                 raise ValueError(f"Invalid image file: {str(e)}")
             
-            logger.info(f"Image format: {image.format}, Size: {image.size}")
+            logger.debug("Image format: %s, Size: %s", image.format, image.size)
             
-            # Process with Textract
-            text = self._process_image_with_textract(image)
+            # Process with Textract, sending the upload as-is when Textract
+            # reads the format natively instead of decoding and re-encoding it
+            if image.format in self.TEXTRACT_NATIVE_FORMATS:
+                text = self._detect_document_text(file_content)
+            else:
+                # Need to reopen after verify
+                text = self._process_image_with_textract(
+                    Image.open(io.BytesIO(file_content))
+                )
             
             return {
                 'success': True,
@@ -289,7 +429,7 @@ class DocumentProcessor:
             }
         
         except Exception as e:
-            logger.error(f"Error processing image: {str(e)}")
+            logger.error("Error processing image: %s", e)
             return {
                 'success': False,
                 'error': f"Image processing failed: {str(e)}",
@@ -307,32 +447,44 @@ class DocumentProcessor:
         Returns:
             Extracted text
         """
-        try:
-            # Convert PIL image to bytes
-            img_bytes = io.BytesIO()
-            image.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
+        # Convert PIL image to bytes
+        img_bytes = io.BytesIO()
+        image.save(img_bytes, format='PNG')
+        
+        return self._detect_document_text(img_bytes.getvalue(), page_num)
+    
+    def _detect_document_text(self, image_bytes: bytes, page_num: Optional[int] = None) -> str:
+        """
+        Use AWS Textract to extract text from encoded image bytes.
+        
+        Args:
+            image_bytes: Image file content in a format Textract accepts
+            page_num: Optional page number for logging
             
+        Returns:
+            Extracted text
+        """
+        try:
             page_info = f" (page {page_num})" if page_num else ""
-            logger.info(f"Sending image{page_info} to Textract")
+            logger.debug("Sending image%s to Textract", page_info)
             
             # Call Textract
             response = self.textract_client.detect_document_text(
-                Document={'Bytes': img_bytes.getvalue()}
+                Document={'Bytes': image_bytes}
             )
             
-            # Extract text from response
-            text = ""
-            if 'Blocks' in response:
-                for block in response['Blocks']:
-                    if block['BlockType'] == 'LINE':
-                        text += block.get('Text', '') + '\n'
+            # Extract text from response, one line per LINE block
+            text = ''.join(
+                block.get('Text', '') + '\n'
+                for block in response.get('Blocks', ())
+                if block['BlockType'] == 'LINE'
+            )
             
-            logger.info(f"Successfully extracted text{page_info}")
+            logger.debug("Successfully extracted text%s", page_info)
             return text
         
         except Exception as e:
-            logger.error(f"Error in Textract processing: {str(e)}")
+            logger.error("Error in Textract processing: %s", e)
             raise
     
     def download_and_process(self, bucket: str, key: str, content_type: str) -> Dict[str, Any]:
@@ -348,36 +500,54 @@ class DocumentProcessor:
             Processing result
         """
         try:
-            logger.info(f"Downloading {key} from {bucket}")
+            logger.info("Downloading %s from %s", key, bucket)
+            
+            # Download from S3; a missing key is an expected client error, so
+            # report it directly rather than through the generic handler below
+            try:
+                response = self.s3_client.get_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in self.S3_NOT_FOUND_CODES:
+                    raise
+                logger.warning("Document not found: s3://%s/%s", bucket, key)
+                return {
+                    'success': False,
+                    'error': f"Document not found: s3://{bucket}/{key}"
+                }
+            
+            # Reject oversized objects before pulling the body into memory
+            content_length = response.get('ContentLength')
+            if content_length is not None and content_length > self.MAX_FILE_SIZE:
+                response['Body'].close()
+                return self._validation_failure({
+                    'valid': False,
+                    'errors': [self._file_size_error(content_length)],
+                    'warnings': [],
+                    'file_size': content_length
+                })
             
-            # Download from S3
-            response = self.s3_client.get_object(Bucket=bucket, Key=key)
             file_content = response['Body'].read()
             
             # Validate document
             validation = self.validate_document(file_content, content_type)
             if not validation['valid']:
-                logger.error(f"Document validation failed: {validation['errors']}")
-                return {
-                    'success': False,
-                    'error': f"Document validation failed: {', '.join(validation['errors'])}",
-                    'validation': validation
-                }
+                return self._validation_failure(validation)
             
             # Detect encoding for text files
             encoding_info = self.detect_encoding(file_content)
-            logger.info(f"Detected encoding: {encoding_info['encoding']} (confidence: {encoding_info['confidence']})")
+            logger.info(
+                "Detected encoding: %s (confidence: %s)",
+                encoding_info['encoding'], encoding_info['confidence']
+            )
             
             # Process based on format
-            if content_type == 'application/pdf':
-                result = self.process_pdf(file_content)
-            elif content_type in ['image/png', 'image/jpeg', 'image/jpg', 'image/tiff']:
-                result = self.process_image(file_content)
-            else:
+            processor_name = self.FORMAT_PROCESSORS.get(self.SUPPORTED_FORMATS.get(content_type))
+            if processor_name is None:
                 return {
                     'success': False,
                     'error': f"Unsupported file format: {content_type}"
                 }
+            result = getattr(self, processor_name)(file_content)
             
             # Add encoding info to result
             if 'metadata' not in result:
@@ -387,13 +557,37 @@ class DocumentProcessor:
             return result
         
         except Exception as e:
-            logger.error(f"Error in download_and_process: {str(e)}")
+            logger.error("Error in download_and_process: %s", e)
             return {
                 'success': False,
                 'error': str(e)
             }
 
 
+# Shared processor reused across warm Lambda invocations; handler.py uses
+# the same instance
+PROCESSOR = DocumentProcessor()
+
+
+def dumps_json(obj: Any) -> str:
+    """
+    Encode a value as a JSON string.
+    
+    orjson is used first; values it rejects, such as strings with lone
+    surrogates, are encoded with the stdlib json module instead.
+    
+    Args:
+        obj: The value to encode
+        
+    Returns:
+        JSON string
+    """
+    try:
+        return orjson.dumps(obj).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(obj)
+
+
 def lambda_handler(event, context):
     """
     AWS Lambda handler for document processing.
@@ -406,7 +600,7 @@ def lambda_handler(event, context):
     }
     """
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        logger.debug("Received event: %s", event)
         
         # Extract parameters
         bucket = event.get('bucket')
@@ -416,23 +610,22 @@ def lambda_handler(event, context):
         if not bucket or not key:
             return {
                 'statusCode': 400,
-                'body': json.dumps({'error': 'Missing required parameters: bucket and key'})
+                'body': dumps_json({'error': 'Missing required parameters: bucket and key'})
             }
         
         # Process document
-        processor = DocumentProcessor()
-        result = processor.download_and_process(bucket, key, content_type)
+        result = PROCESSOR.download_and_process(bucket, key, content_type)
         
         status_code = 200 if result.get('success') else 400
         
         return {
             'statusCode': status_code,
-            'body': json.dumps(result)
+            'body': dumps_json(result)
         }
     
     except Exception as e:
-        logger.error(f"Error in lambda_handler: {str(e)}")
+        logger.error("Error in lambda_handler: %s", e)
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': f"Internal server error: {str(e)}"})
+            'body': dumps_json({'error': f"Internal server error: {str(e)}"})
         }
@@ -0,0 +1,155 @@
+"""Unit tests for the AIAnalyzer analysis pipeline."""
+import json
+import unittest
+from unittest import mock
+
+import orjson
+
+from src.lambdas.ai_analyzer.ai_analyzer import AIAnalyzer
+
+
+def _stub_analyzers(analyzer):
+    """Replace the sub-analyzers of an AIAnalyzer with fixed-result mocks."""
+    analyzer.entity_extractor = mock.MagicMock()
+    analyzer.entity_extractor._extract_entities.return_value = {
+        'PERSON': ['Alice'], 'ORGANIZATION': [], 'LOCATION': [], 'PROPER_NOUNS': []
+    }
+    analyzer.sentiment_analyzer = mock.MagicMock()
+    analyzer.sentiment_analyzer._analyze_sentiment.return_value = {
+        'overall_sentiment': 'POSITIVE', 'confidence': 0.5,
+        'scores': {}, 'sentences': []
+    }
+    analyzer.keyword_extractor = mock.MagicMock()
+    analyzer.keyword_extractor._extract_keywords.return_value = [
+        {'keyword': 'report', 'frequency': 2, 'relevance': 0.6}
+    ]
+
+
+class TestSharedSentences(unittest.TestCase):
+    """Test cases for the sentence split shared between analyzers."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.analyzer = AIAnalyzer()
+        _stub_analyzers(self.analyzer)
+    
+    def test_sentences_passed_to_analyzers(self):
+        """Test that both sentence-level analyzers get the shared split."""
+        with mock.patch(
+            'src.lambdas.ai_analyzer.ai_analyzer.sent_tokenize',
+            return_value=['Alice wrote the report.']
+        ) as sent_tokenize:
+            self.analyzer.analyze("Alice wrote the report.")
+        
+        sent_tokenize.assert_called_once_with("Alice wrote the report.")
+        self.analyzer.entity_extractor._extract_entities.assert_called_once_with(
+            "Alice wrote the report.", ['Alice wrote the report.']
+        )
+        self.analyzer.sentiment_analyzer._analyze_sentiment.assert_called_once_with(
+            "Alice wrote the report.", ['Alice wrote the report.']
+        )
+    
+    def test_split_failure_degrades(self):
+        """Test that a tokenizer failure falls back instead of raising."""
+        with mock.patch(
+            'src.lambdas.ai_analyzer.ai_analyzer.sent_tokenize',
+            side_effect=LookupError("punkt")
+        ):
+            result = self.analyzer.analyze("Alice wrote the report.")
+        
+        self.assertEqual(result['keywords'][0]['keyword'], 'report')
+        self.analyzer.entity_extractor._extract_entities.assert_called_once_with(
+            "Alice wrote the report.", None
+        )
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Test cases for AIAnalyzer result caching."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.analyzer = AIAnalyzer()
+        _stub_analyzers(self.analyzer)
+        self.entities = self.analyzer.entity_extractor._extract_entities
+    
+    def test_cache_hit(self):
+        """Test that repeated text is served from the cache."""
+        first = self.analyzer.analyze("Alice wrote the report.")
+        second = self.analyzer.analyze("Alice wrote the report.")
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.entities.call_count, 1)
+        self.assertEqual(orjson.loads(self.analyzer.analyze_json("Alice wrote the report.")), first)
+        self.assertEqual(self.entities.call_count, 1)
+    
+    def test_cached_result_is_not_shared(self):
+        """Test that mutating a returned result leaves the cache intact."""
+        first = self.analyzer.analyze("Alice wrote the report.")
+        first['entities']['PERSON'].append('Mallory')
+        
+        second = self.analyzer.analyze("Alice wrote the report.")
+        
+        self.assertEqual(second['entities']['PERSON'], ['Alice'])
+        self.assertIsNot(first, second)
+    
+    def test_eviction_by_count(self):
+        """Test that the least recently used entry is evicted."""
+        with mock.patch.object(AIAnalyzer, 'CACHE_SIZE', 2):
+            self.analyzer.analyze("first")
+            self.analyzer.analyze("second")
+            self.analyzer.analyze("first")
+            self.analyzer.analyze("third")
+            self.assertEqual(self.entities.call_count, 3)
+            
+            self.analyzer.analyze("first")
+            self.assertEqual(self.entities.call_count, 3)
+            self.analyzer.analyze("second")
+            self.assertEqual(self.entities.call_count, 4)
+    
+    def test_eviction_by_size(self):
+        """Test that the cache stays within its byte budget."""
+        entry_size = len(self.analyzer.analyze_json("first"))
+        with mock.patch.object(AIAnalyzer, 'CACHE_MAX_BYTES', entry_size * 2):
+            for text in ("second", "third", "fourth"):
+                self.analyzer.analyze(text)
+            
+            self.assertEqual(len(self.analyzer._cache), 2)
+            self.assertLessEqual(self.analyzer._cache_bytes, entry_size * 2)
+    
+    def test_oversized_result_not_cached(self):
+        """Test that results over the entry limit are not cached."""
+        with mock.patch.object(AIAnalyzer, 'CACHE_MAX_ENTRY_BYTES', 1):
+            self.analyzer.analyze("Alice wrote the report.")
+        
+        self.assertEqual(len(self.analyzer._cache), 0)
+        self.assertEqual(self.analyzer._cache_bytes, 0)
+    
+    def test_fallback_result_not_cached(self):
+        """Test that a result with a failed analyzer is retried next time."""
+        self.entities.side_effect = [LookupError("missing data"), mock.DEFAULT]
+        
+        first = self.analyzer.analyze("Alice wrote the report.")
+        second = self.analyzer.analyze("Alice wrote the report.")
+        
+        self.assertEqual(first['entities']['PERSON'], [])
+        self.assertEqual(second['entities']['PERSON'], ['Alice'])
+        self.assertEqual(self.entities.call_count, 2)
+    
+    def test_lone_surrogate_not_cached(self):
+        """Test that text orjson cannot encode is analyzed but not cached."""
+        text = "Alice wrote x\ud800y."
+        self.analyzer.sentiment_analyzer._analyze_sentiment.return_value = {
+            'overall_sentiment': 'NEUTRAL', 'confidence': 0.0, 'scores': {},
+            'sentences': [{'sentence': text, 'sentiment': 'NEUTRAL', 'confidence': 0.0}]
+        }
+        
+        result = self.analyzer.analyze(text)
+        body = self.analyzer.analyze_json(text)
+        
+        self.assertEqual(result['sentiment']['sentences'][0]['sentence'], text)
+        self.assertEqual(json.loads(body), result)
+        self.assertEqual(len(self.analyzer._cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
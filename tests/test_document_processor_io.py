@@ -0,0 +1,210 @@
+"""Unit tests for document processor validation, encoding and S3 handling."""
+import os
+import unittest
+from unittest import mock
+
+# boto3 clients are created at import time and need a region
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from botocore.exceptions import ClientError
+
+from src.lambdas.document_processor.document_processor import DocumentProcessor
+
+
+def _client_error(code):
+    """Build a botocore ClientError with the given S3 error code."""
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'GetObject')
+
+
+class TestCheckDecodable(unittest.TestCase):
+    """Test cases for DocumentProcessor._check_decodable."""
+    
+    ENCODINGS = (
+        'utf-8', 'utf-16', 'utf-16-le', 'utf-16-be', 'utf-32',
+        'cp1252', 'latin-1', 'ascii', 'shift_jis'
+    )
+    
+    SAMPLE = 'café € 😀 日本語'
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor()
+        self.chunk = self.processor.DECODE_CHUNK_SIZE
+    
+    def assertMatchesDecode(self, content, encoding):
+        """Assert _check_decodable accepts content exactly when bytes.decode does."""
+        try:
+            content.decode(encoding)
+        except UnicodeDecodeError:
+            with self.assertRaises(UnicodeDecodeError):
+                self.processor._check_decodable(content, encoding)
+        else:
+            self.processor._check_decodable(content, encoding)
+    
+    def test_matches_decode_across_chunk_boundary(self):
+        """Test multibyte characters straddling the chunk boundary."""
+        for encoding in self.ENCODINGS:
+            width = len('aa'.encode(encoding)) - len('a'.encode(encoding))
+            sample = self.SAMPLE.encode(encoding, 'ignore').decode(encoding)
+            for shift in range(1, 5):
+                text = 'a' * (self.chunk // width - shift) + sample
+                content = text.encode(encoding)
+                with self.subTest(encoding=encoding, shift=shift):
+                    self.assertMatchesDecode(content, encoding)
+                with self.subTest(encoding=encoding, shift=shift, truncated=True):
+                    self.assertMatchesDecode(content[:-1], encoding)
+    
+    def test_invalid_bytes_at_chunk_boundary(self):
+        """Test an invalid sequence split across the chunk boundary."""
+        content = b'a' * (self.chunk - 1) + b'\xe2\x82' + b'a' * 10
+        for encoding in self.ENCODINGS:
+            with self.subTest(encoding=encoding):
+                self.assertMatchesDecode(content, encoding)
+    
+    def test_unknown_encoding(self):
+        """Test that an unknown encoding raises LookupError."""
+        with self.assertRaises(LookupError):
+            self.processor._check_decodable(b'text', 'no-such-encoding')
+
+
+class TestPDFValidation(unittest.TestCase):
+    """Test cases for the PDF header and trailer windows."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor()
+        self.body = b' ' * 4096
+    
+    def test_signature_at_start(self):
+        """Test a PDF that starts with its signature."""
+        content = b'%PDF-1.7\n' + self.body + b'%%EOF\n'
+        self.assertTrue(self.processor._validate_pdf(content))
+    
+    def test_signature_inside_header_window(self):
+        """Test a PDF with leading junk before its signature."""
+        junk = b'x' * (self.processor.PDF_HEADER_WINDOW - len(b'%PDF'))
+        content = junk + b'%PDF-1.7\n' + self.body + b'%%EOF\n'
+        self.assertTrue(self.processor._validate_pdf(content))
+    
+    def test_signature_beyond_header_window(self):
+        """Test that a signature past the header window is rejected."""
+        junk = b'x' * self.processor.PDF_HEADER_WINDOW
+        content = junk + b'%PDF-1.7\n' + self.body + b'%%EOF\n'
+        with self.assertLogs(level='WARNING') as logs:
+            self.assertFalse(self.processor._validate_pdf(content))
+        self.assertIn(
+            f"no %PDF signature in the first {self.processor.PDF_HEADER_WINDOW} bytes",
+            logs.output[0]
+        )
+    
+    def test_eof_inside_trailer_window(self):
+        """Test that an EOF marker in the trailer raises no warning."""
+        trailer = b'\n' * (self.processor.PDF_TRAILER_WINDOW - len(b'%%EOF'))
+        content = b'%PDF-1.7\n' + self.body + b'%%EOF' + trailer
+        with self.assertNoLogs(level='WARNING'):
+            self.assertTrue(self.processor._validate_pdf(content))
+    
+    def test_eof_beyond_trailer_window(self):
+        """Test that an EOF marker before the trailer only warns."""
+        trailer = b'\n' * self.processor.PDF_TRAILER_WINDOW
+        content = b'%PDF-1.7\n' + self.body + b'%%EOF' + trailer
+        with self.assertLogs(level='WARNING'):
+            self.assertTrue(self.processor._validate_pdf(content))
+
+
+class TestFormatDispatch(unittest.TestCase):
+    """Test cases for the format processor table."""
+    
+    def test_every_format_has_a_processor(self):
+        """Test that every supported format maps to an existing method."""
+        processor = DocumentProcessor()
+        for content_type, fmt in DocumentProcessor.SUPPORTED_FORMATS.items():
+            with self.subTest(content_type=content_type):
+                self.assertIn(fmt, DocumentProcessor.FORMAT_PROCESSORS)
+                method = getattr(processor, DocumentProcessor.FORMAT_PROCESSORS[fmt])
+                self.assertTrue(callable(method))
+
+
+class TestDownloadAndProcess(unittest.TestCase):
+    """Test cases for DocumentProcessor.download_and_process."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor()
+        self.processor.s3_client = mock.MagicMock()
+        self.processor.textract_client = mock.MagicMock()
+        self.pdf = b'%PDF-1.7\n' + b' ' * 4096 + b'%%EOF\n'
+    
+    def _respond_with(self, content, content_length=None):
+        """Make get_object return a response wrapping content."""
+        body = mock.MagicMock()
+        body.read.return_value = content
+        self.processor.s3_client.get_object.return_value = {
+            'Body': body,
+            'ContentLength': len(content) if content_length is None else content_length
+        }
+        return body
+    
+    def test_oversized_object_skips_download(self):
+        """Test that ContentLength over the limit is rejected before reading."""
+        size = self.processor.MAX_FILE_SIZE + 1
+        body = self._respond_with(b'', content_length=size)
+        
+        result = self.processor.download_and_process('bucket', 'doc.pdf', 'application/pdf')
+        
+        self.assertFalse(result['success'])
+        self.assertFalse(result['validation']['valid'])
+        self.assertEqual(result['validation']['file_size'], size)
+        self.assertEqual(
+            result['error'],
+            f"Document validation failed: {result['validation']['errors'][0]}"
+        )
+        body.read.assert_not_called()
+        body.close.assert_called_once()
+    
+    def test_gate_matches_validate_document(self):
+        """Test that the early gate reports the same error as full validation."""
+        size = self.processor.MAX_FILE_SIZE + 1
+        self._respond_with(b'', content_length=size)
+        
+        result = self.processor.download_and_process('bucket', 'doc.pdf', 'application/pdf')
+        validation = self.processor.validate_document(b'%PDF' + b' ' * size, 'application/pdf')
+        
+        self.assertIn(result['validation']['errors'][0], validation['errors'])
+    
+    def test_dispatch_uses_instance_methods(self):
+        """Test that format processors are looked up on the instance."""
+        self._respond_with(self.pdf)
+        
+        with mock.patch.object(
+            DocumentProcessor, 'process_pdf', return_value={'success': True, 'text': 'ok'}
+        ) as process_pdf:
+            result = self.processor.download_and_process('bucket', 'doc.pdf', 'application/pdf')
+        
+        process_pdf.assert_called_once_with(self.pdf)
+        self.assertTrue(result['success'])
+        self.assertIn('encoding', result['metadata'])
+    
+    def test_missing_key(self):
+        """Test that a missing S3 object is reported as not found."""
+        for code in ('NoSuchKey', '404'):
+            with self.subTest(code=code):
+                self.processor.s3_client.get_object.side_effect = _client_error(code)
+                
+                result = self.processor.download_and_process('bucket', 'doc.pdf', 'application/pdf')
+                
+                self.assertFalse(result['success'])
+                self.assertEqual(result['error'], "Document not found: s3://bucket/doc.pdf")
+    
+    def test_other_client_error(self):
+        """Test that other S3 errors go to the generic handler."""
+        self.processor.s3_client.get_object.side_effect = _client_error('AccessDenied')
+        
+        result = self.processor.download_and_process('bucket', 'doc.pdf', 'application/pdf')
+        
+        self.assertFalse(result['success'])
+        self.assertIn('AccessDenied', result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Unit tests comparing keyword extraction with the original implementation."""
+import unittest
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from src.lambdas.ai_analyzer.ai_analyzer import (
+    KeywordExtractor, _KEYWORD_TOKEN_RE, _KEYWORD_VOCABULARY
+)
+
+
+STOP_WORDS = set(stopwords.words('english'))
+ENGLISH_WORDS = set(nltk.corpus.words.words())
+
+SAMPLE_TEXT = (
+    "The committee reviewed the annual budget report in March. "
+    "Several members questioned the travel budget, and the report was "
+    "sent back for revision. The revised report reduced travel costs "
+    "and moved the savings into the training budget."
+)
+
+
+def baseline_keywords(text, top_n=10):
+    """Extract keywords the way KeywordExtractor originally did."""
+    tokens = word_tokenize(text.lower())
+    filtered_tokens = [
+        token for token in tokens
+        if (len(token) > 2 and
+            token.isalpha() and
+            token not in STOP_WORDS and
+            token in ENGLISH_WORDS)
+    ]
+    term_freq = {}
+    for token in filtered_tokens:
+        term_freq[token] = term_freq.get(token, 0) + 1
+    keywords = []
+    for term, freq in term_freq.items():
+        relevance_score = freq / len(filtered_tokens) + min(len(term) / 20, 0.3)
+        keywords.append({
+            'keyword': term,
+            'frequency': freq,
+            'relevance': round(relevance_score, 4)
+        })
+    keywords.sort(key=lambda x: x['relevance'], reverse=True)
+    return keywords[:top_n]
+
+
+class TestKeywordTokenization(unittest.TestCase):
+    """Test cases for the regex keyword tokenizer."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.extractor = KeywordExtractor()
+    
+    def test_matches_baseline(self):
+        """Test that plain prose gives the original keywords."""
+        self.assertEqual(
+            self.extractor.extract_keywords(SAMPLE_TEXT),
+            baseline_keywords(SAMPLE_TEXT)
+        )
+    
+    def test_hyphenated_compounds_are_split(self):
+        """Test that hyphenated compounds now contribute their parts."""
+        text = "A well-known report."
+        keywords = [k['keyword'] for k in self.extractor.extract_keywords(text)]
+        baseline = [k['keyword'] for k in baseline_keywords(text)]
+        
+        self.assertIn('known', keywords)
+        self.assertNotIn('known', baseline)
+
+
+class TestKeywordRanking(unittest.TestCase):
+    """Test cases for top-N keyword selection."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.extractor = KeywordExtractor()
+    
+    def test_ties_keep_first_occurrence_order(self):
+        """Test that tied terms come back in the order of the original sort."""
+        text = "river stone cloud bread chair table plant horse grape lemon sugar tiger"
+        baseline = baseline_keywords(text, top_n=20)
+        self.assertEqual(len({k['relevance'] for k in baseline}), 1)
+        
+        self.assertEqual(
+            self.extractor.extract_keywords(text, top_n=5),
+            baseline_keywords(text, top_n=5)
+        )
+    
+    def test_matches_baseline_order(self):
+        """Test that mixed scores rank as in the original sort."""
+        for top_n in (1, 3, 10, 50):
+            with self.subTest(top_n=top_n):
+                self.assertEqual(
+                    self.extractor.extract_keywords(SAMPLE_TEXT, top_n=top_n),
+                    baseline_keywords(SAMPLE_TEXT, top_n=top_n)
+                )
+
+
+class TestKeywordVocabulary(unittest.TestCase):
+    """Test cases for the merged keyword vocabulary filter."""
+    
+    def test_matches_separate_filters(self):
+        """Test that one vocabulary lookup equals the stop word and corpus checks."""
+        candidates = {word.lower() for word in ENGLISH_WORDS | STOP_WORDS}
+        mismatches = [
+            token for token in sorted(candidates)
+            if _KEYWORD_TOKEN_RE.fullmatch(token) and
+            (token in _KEYWORD_VOCABULARY) !=
+            (token not in STOP_WORDS and token in ENGLISH_WORDS)
+        ]
+        
+        self.assertEqual(mismatches, [])
+    
+    def test_filters_sample_tokens(self):
+        """Test the filter on the tokens of a sample text."""
+        tokens = _KEYWORD_TOKEN_RE.findall(SAMPLE_TEXT.lower())
+        
+        self.assertEqual(
+            [token for token in tokens if token in _KEYWORD_VOCABULARY],
+            [token for token in tokens
+             if token not in STOP_WORDS and token in ENGLISH_WORDS]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()